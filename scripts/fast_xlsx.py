@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Minimal direct-XML xlsx writer for large single-sheet outputs.
+
+An xlsx file is just a zip archive with a handful of XML parts. For plain
+tabular data this module streams the sheet XML straight into the archive,
+skipping openpyxl's per-cell object construction entirely. Numbers are
+written as native numeric cells and everything else as inline strings, so
+the result opens in Excel and reads back through pandas/openpyxl.
+"""
+from __future__ import annotations
+
+import numbers
+import zipfile
+from pathlib import Path
+from typing import Iterable, List, Sequence
+from xml.sax.saxutils import escape
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+
+_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+_SHEET_FOOTER = "</sheetData></worksheet>"
+
+
+def _column_letters(count: int) -> List[str]:
+    letters = []
+    for idx in range(1, count + 1):
+        name = ""
+        while idx:
+            idx, rem = divmod(idx - 1, 26)
+            name = chr(ord("A") + rem) + name
+        letters.append(name)
+    return letters
+
+
+def _cell_xml(ref: str, value) -> str:
+    if value is None:
+        return f'<c r="{ref}"/>'
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        return f'<c r="{ref}" t="n"><v>{value}</v></c>'
+    return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def write_sheet(
+    rows: Iterable[Sequence], output: Path, sheet_name: str = "Sheet1"
+) -> None:
+    """Write rows (header included by the caller) as a single-sheet xlsx.
+
+    The file is created from scratch; any previous content of ``output``,
+    including other sheets, is replaced.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    letters: List[str] = []
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr(
+            "xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name, {'"': "&quot;"}))
+        )
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(_SHEET_HEADER.encode("utf-8"))
+            for row_idx, row in enumerate(rows, start=1):
+                if len(letters) < len(row):
+                    letters = _column_letters(len(row))
+                cells = "".join(
+                    _cell_xml(f"{letters[col]}{row_idx}", value)
+                    for col, value in enumerate(row)
+                )
+                sheet.write(f'<row r="{row_idx}">{cells}</row>'.encode("utf-8"))
+            sheet.write(_SHEET_FOOTER.encode("utf-8"))
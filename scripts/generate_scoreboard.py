@@ -3,13 +3,33 @@
 from __future__ import annotations
 
 import argparse
-import re
+import functools
+import itertools
+import os
 import sys
 from pathlib import Path
 from typing import Iterable, Tuple
 
+import numpy as np
+import openpyxl
 import pandas as pd
 
+import fast_xlsx
+
+try:  # optional: multithreaded CSV parsing when pyarrow is installed
+    import pyarrow  # noqa: F401
+except ImportError:
+    _HAS_PYARROW = False
+else:
+    _HAS_PYARROW = True
+
+try:  # optional: polars' native parser is faster still when available
+    import polars
+except ImportError:
+    _HAS_POLARS = False
+else:
+    _HAS_POLARS = True
+
 PREDICTION_COLUMNS = {
     "match_id",
     "round",
@@ -28,6 +48,18 @@ RESULT_COLUMNS = {
     "away_goals",
 }
 
+# dtype hints let the CSV parser skip type inference on the hot columns.
+PREDICTION_DTYPES = {
+    "round": "Int64",
+    "predicted_home_goals": "Int64",
+    "predicted_away_goals": "Int64",
+}
+RESULT_DTYPES = {
+    "round": "Int64",
+    "home_goals": "Int64",
+    "away_goals": "Int64",
+}
+
 COLUMN_TRANSLATIONS = {
     "Place": "Місце",
     "User ID": "User ID",
@@ -38,7 +70,6 @@ COLUMN_TRANSLATIONS = {
     "Avg points per round": "Середня кількість балів за тури",
 }
 ROUND_METRIC_TRANSLATIONS = {"exact": "Точні прогнози матчів", "points": "бали"}
-ROUND_COLUMN_PATTERN = re.compile(r"Round (\d+) (exact|points)$")
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DEFAULT_PREDICTIONS_PATH = BASE_DIR / "data" / "predictions_sample.csv"
@@ -51,16 +82,95 @@ class ScoreComputationError(Exception):
     """Raised when we cannot compute a standings table."""
 
 
-def _read_table(path: Path) -> pd.DataFrame:
+def _read_table(path: Path, dtype: dict | None = None) -> pd.DataFrame:
     suffix = path.suffix.lower()
     if suffix in {".csv", ".txt"}:
+        snapshot = path.with_suffix(".feather")
+        if _HAS_PYARROW and snapshot.exists():
+            try:
+                # A snapshot at least as new as the CSV holds the same table
+                # in columnar form; reading it skips the tokenizing parse.
+                if snapshot.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+                    return pd.read_feather(snapshot)
+            except (OSError, ValueError):
+                pass
         sep = "\t" if suffix == ".txt" else ","
+        if _HAS_POLARS:
+            try:
+                frame = polars.read_csv(path, separator=sep).to_pandas()
+                if dtype:
+                    # The pandas engines ignore dtype keys for absent columns;
+                    # match that so _ensure_columns reports the missing ones.
+                    frame = frame.astype(
+                        {col: kind for col, kind in dtype.items() if col in frame.columns}
+                    )
+                return frame
+            except (ImportError, TypeError, ValueError, polars.exceptions.PolarsError):
+                # Malformed cells, an unsupported layout, or to_pandas missing
+                # its pyarrow dependency: retry below.
+                pass
+        if _HAS_PYARROW:
+            try:
+                return pd.read_csv(path, sep=sep, dtype=dtype, engine="pyarrow")
+            except (TypeError, ValueError):
+                # Unsupported option or malformed cells: retry below.
+                pass
+        if dtype is not None:
+            try:
+                return pd.read_csv(path, sep=sep, dtype=dtype)
+            except (TypeError, ValueError):
+                # Malformed cells: fall back to the untyped parse so
+                # _coerce_int_column can report the offending values.
+                pass
         return pd.read_csv(path, sep=sep)
     if suffix in {".xls", ".xlsx"}:
         return pd.read_excel(path)
     raise ScoreComputationError(f"Unsupported file type: {path.suffix}")
 
 
+def write_snapshot(frame: pd.DataFrame, csv_path: Path) -> None:
+    """Write a .feather sibling of csv_path so later reads skip the CSV parse.
+
+    A no-op without pyarrow; snapshot failures are ignored since the CSV
+    stays authoritative either way.
+    """
+    if not _HAS_PYARROW:
+        return
+    try:
+        frame.to_feather(csv_path.with_suffix(".feather"))
+    except (ValueError, OSError):
+        pass
+
+
+def load_predictions(path: Path) -> pd.DataFrame:
+    """Read a predictions table with the standard dtype hints."""
+    return _read_table(path, dtype=PREDICTION_DTYPES)
+
+
+def load_results(path: Path) -> pd.DataFrame:
+    """Read a results table with the standard dtype hints."""
+    return _read_table(path, dtype=RESULT_DTYPES)
+
+
+def frame_from_rows(rows, columns: Iterable[str], dtype: dict | None = None) -> pd.DataFrame:
+    """Build a frame from importer row tuples, typed like a _read_table parse.
+
+    Lets callers that already hold the rows in memory skip re-reading the CSV
+    they just wrote.
+    """
+    frame = pd.DataFrame(rows, columns=list(columns))
+    # The CSV parser reads empty cells as missing; mirror that before typing.
+    frame = frame.replace("", pd.NA)
+    if dtype:
+        try:
+            frame = frame.astype(dtype)
+        except (TypeError, ValueError):
+            # Malformed cells: keep the untyped frame so _coerce_int_column
+            # can report the offending values.
+            pass
+    return frame
+
+
 def _ensure_columns(df: pd.DataFrame, required: Iterable[str], label: str) -> None:
     missing = [col for col in required if col not in df.columns]
     if missing:
@@ -70,41 +180,40 @@ def _ensure_columns(df: pd.DataFrame, required: Iterable[str], label: str) -> No
 
 
 def _coerce_int_column(df: pd.DataFrame, column: str, label: str) -> None:
-    series = pd.to_numeric(df[column], errors="coerce")
-    invalid_mask = series.isna()
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+    invalid_mask = np.isnan(values)
     if invalid_mask.any():
         sample = df.loc[invalid_mask, column].astype(str).head(3).tolist()
         raise ScoreComputationError(
             f"{label} has non-numeric values in '{column}': {', '.join(sample)}"
         )
-    non_integer_mask = (series % 1) != 0
+    integers = values.astype(np.int64)
+    non_integer_mask = integers != values
     if non_integer_mask.any():
         sample = df.loc[non_integer_mask, column].astype(str).head(3).tolist()
         raise ScoreComputationError(
             f"{label} has non-integer values in '{column}': {', '.join(sample)}"
         )
-    df[column] = series.astype(int)
+    df[column] = integers
 
 
-def _winner_sign(diff: int) -> str:
-    if diff > 0:
-        return "H"
-    if diff < 0:
-        return "A"
-    return "D"
+_WINNER_LABELS = np.array(["A", "D", "H"])
 
 
-def _load_inputs(pred_path: Path, result_path: Path) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    predictions = _read_table(pred_path)
-    results = _read_table(result_path)
+def _prepare_inputs(
+    predictions: pd.DataFrame, results: pd.DataFrame
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     _ensure_columns(predictions, PREDICTION_COLUMNS, "Prediction file")
     _ensure_columns(results, RESULT_COLUMNS, "Result file")
+    # Participants repeat across many rows; categories keep one copy per name
+    # and speed up the downstream groupbys.
+    for col in ("user_id", "user"):
+        if col in predictions.columns:
+            predictions[col] = predictions[col].astype("category")
     return predictions, results
 
 
 def _score_predictions(predictions: pd.DataFrame, results: pd.DataFrame) -> pd.DataFrame:
-    predictions = predictions.copy()
-    results = results.copy()
     participant_cols = ["user_id", "user"] if "user_id" in predictions.columns else ["user"]
     all_participants = (
         predictions[participant_cols].drop_duplicates()
@@ -112,13 +221,14 @@ def _score_predictions(predictions: pd.DataFrame, results: pd.DataFrame) -> pd.D
         else pd.DataFrame(columns=participant_cols)
     )
 
-    predictions.rename(
+    # rename returns a new frame that shares the column data, so neither
+    # input needs a defensive deep copy; `results` is only ever read.
+    predictions = predictions.rename(
         columns={
             "round": "round_pred",
             "home_team": "home_team_pred",
             "away_team": "away_team_pred",
-        },
-        inplace=True,
+        }
     )
     merged = predictions.merge(results, on="match_id", how="left", suffixes=("_pred", "_act"))
 
@@ -152,42 +262,41 @@ def _score_predictions(predictions: pd.DataFrame, results: pd.DataFrame) -> pd.D
         _coerce_int_column(merged, col, "Merged data")
     _coerce_int_column(merged, "round", "Merged data")
 
-    merged["actual_diff"] = merged["home_goals"] - merged["away_goals"]
-    merged["predicted_diff"] = merged["predicted_home_goals"] - merged["predicted_away_goals"]
-    merged["actual_winner"] = merged["actual_diff"].apply(_winner_sign)
-    merged["predicted_winner"] = merged["predicted_diff"].apply(_winner_sign)
-
-    merged["is_exact"] = (
-        (merged["predicted_home_goals"] == merged["home_goals"]) &
-        (merged["predicted_away_goals"] == merged["away_goals"])
+    # Score everything on plain ndarrays so the comparisons and the point
+    # selection run as a handful of fused NumPy passes without Series
+    # temporaries.
+    predicted_home = merged["predicted_home_goals"].to_numpy()
+    predicted_away = merged["predicted_away_goals"].to_numpy()
+    home = merged["home_goals"].to_numpy()
+    away = merged["away_goals"].to_numpy()
+    actual_diff = home - away
+    predicted_diff = predicted_home - predicted_away
+    actual_sign = np.sign(actual_diff).astype(np.int8)
+    predicted_sign = np.sign(predicted_diff).astype(np.int8)
+    is_exact = (predicted_home == home) & (predicted_away == away)
+    has_winner = predicted_sign == actual_sign
+    has_diff = predicted_diff == actual_diff
+
+    merged["actual_diff"] = actual_diff
+    merged["predicted_diff"] = predicted_diff
+    merged["actual_winner"] = _WINNER_LABELS[actual_sign + 1]
+    merged["predicted_winner"] = _WINNER_LABELS[predicted_sign + 1]
+    merged["is_exact"] = is_exact
+    merged["has_winner"] = has_winner
+    merged["has_diff"] = has_diff
+    merged["points"] = np.select(
+        [is_exact, has_winner & has_diff, has_winner], [4, 2, 1], default=0
     )
-    merged["has_winner"] = merged["predicted_winner"] == merged["actual_winner"]
-    merged["has_diff"] = merged["predicted_diff"] == merged["actual_diff"]
-
-    def _row_points(row: pd.Series) -> int:
-        if row["is_exact"]:
-            return 4
-        if row["has_winner"] and row["has_diff"]:
-            return 2
-        if row["has_winner"]:
-            return 1
-        return 0
-
-    merged["points"] = merged.apply(_row_points, axis=1)
 
     missing_participants = pd.DataFrame()
     if not all_participants.empty:
-        merged_part = matched_participants if not matched_participants.empty else pd.DataFrame(columns=participant_cols)
-        missing_participants = (
-            all_participants.merge(
-                merged_part,
-                on=participant_cols,
-                how="left",
-                indicator=True,
-            )
-            .loc[lambda df: df["_merge"] == "left_only"]
-            .drop(columns="_merge")
-        )
+        if matched_participants.empty:
+            missing_participants = all_participants
+        else:
+            # One hash probe per participant instead of an indicator merge.
+            all_index = pd.MultiIndex.from_frame(all_participants)
+            matched_index = pd.MultiIndex.from_frame(matched_participants)
+            missing_participants = all_index.difference(matched_index).to_frame(index=False)
     if not missing_participants.empty:
         default_values = {
             "match_id": pd.NA,
@@ -210,13 +319,12 @@ def _score_predictions(predictions: pd.DataFrame, results: pd.DataFrame) -> pd.D
             "has_diff": False,
             "points": 0,
         }
-        placeholder_rows = []
-        for _, part in missing_participants.iterrows():
-            entry = {col: default_values.get(col, 0) for col in merged.columns}
-            for col in participant_cols:
-                entry[col] = part[col]
-            placeholder_rows.append(entry)
-        merged = pd.concat([merged, pd.DataFrame(placeholder_rows)], ignore_index=True, sort=False)
+        placeholders = missing_participants.copy()
+        for col in merged.columns:
+            if col not in participant_cols:
+                placeholders[col] = default_values.get(col, 0)
+        placeholders = placeholders.reindex(columns=merged.columns)
+        merged = pd.concat([merged, placeholders], ignore_index=True, sort=False)
 
     return merged
 
@@ -225,26 +333,48 @@ def _build_standings(scored: pd.DataFrame) -> pd.DataFrame:
     use_user_id = "user_id" in scored.columns
     participant_cols = ["user_id", "user"] if use_user_id else ["user"]
 
-    per_user = (
-        scored.groupby(participant_cols)
-        .agg(
-            predictions=("match_id", "count"),
-            total_points=("points", "sum"),
-            exact_scores=("is_exact", "sum"),
-            rounds_played=("round", "nunique"),
-        )
-        .reset_index()
+    # observed=True: with categorical participant columns, older pandas
+    # otherwise cross-products the levels and invents phantom participants.
+    per_user = scored.groupby(participant_cols, sort=False, observed=True).agg(
+        predictions=("match_id", "count"),
+        total_points=("points", "sum"),
+        exact_scores=("is_exact", "sum"),
+        rounds_played=("round", "nunique"),
     )
     per_user["avg_points_per_round"] = (
         per_user["total_points"] / per_user["rounds_played"].clip(lower=1)
     ).round(2)
 
-    per_round = (
-        scored.groupby(participant_cols + ["round"])
-        .agg(round_points=("points", "sum"), round_exact=("is_exact", "sum"))
-        .reset_index()
-    )
-    rounds = sorted(per_round["round"].unique())
+    round_values = scored["round"].dropna().unique()
+    if len(round_values) == 1:
+        # Weekly-import fast path: with a single round the per-round numbers
+        # equal the per-user totals, so skip the second groupby and reshape.
+        rnd = round_values[0]
+        per_user[f"Тур {rnd} {ROUND_METRIC_TRANSLATIONS['exact']}"] = per_user[
+            "exact_scores"
+        ].astype(int)
+        per_user[f"Тур {rnd} {ROUND_METRIC_TRANSLATIONS['points']}"] = per_user[
+            "total_points"
+        ].astype(int)
+    elif len(round_values):
+        per_round = scored.groupby(
+            participant_cols + ["round"], sort=False, observed=True
+        ).agg(
+            round_points=("points", "sum"), round_exact=("is_exact", "sum")
+        )
+        rounds = sorted(per_round.index.get_level_values("round").unique())
+        wide = per_round.unstack("round", fill_value=0).astype(int)
+        wide = wide[[(metric, rnd) for rnd in rounds for metric in ("round_exact", "round_points")]]
+        # Emit the localized column names directly; no later rename pass.
+        wide.columns = [
+            f"Тур {rnd} {ROUND_METRIC_TRANSLATIONS['exact' if metric == 'round_exact' else 'points']}"
+            for metric, rnd in wide.columns
+        ]
+        round_columns = list(wide.columns)
+        # Index-aligned concat: both frames share the participant index.
+        per_user = pd.concat([per_user, wide], axis=1)
+        per_user[round_columns] = per_user[round_columns].fillna(0).astype(int)
+    per_user = per_user.reset_index()
 
     sort_by = ["total_points", "exact_scores", "avg_points_per_round"]
     ascending = [False, False, False]
@@ -271,30 +401,6 @@ def _build_standings(scored: pd.DataFrame) -> pd.DataFrame:
         standings.rename(columns={"user_id": "User ID"}, inplace=True)
     standings.drop(columns=["rounds_played"], inplace=True)
 
-    round_lookup = {
-        rnd: grp.set_index(participant_cols)
-        for rnd, grp in per_round.groupby("round")
-    }
-
-    key_column = "_participant_key"
-    if use_user_id:
-        standings[key_column] = list(zip(standings["User ID"], standings["Name"]))
-    else:
-        standings[key_column] = standings["Name"]
-    for rnd in rounds:
-        exact_series = round_lookup[rnd]["round_exact"] if rnd in round_lookup else None
-        point_series = round_lookup[rnd]["round_points"] if rnd in round_lookup else None
-        exact_map = exact_series.to_dict() if exact_series is not None else {}
-        point_map = point_series.to_dict() if point_series is not None else {}
-        standings[f"Round {rnd} exact"] = (
-            standings[key_column].map(exact_map).fillna(0).astype(int)
-        )
-        standings[f"Round {rnd} points"] = (
-            standings[key_column].map(point_map).fillna(0).astype(int)
-        )
-
-    standings.drop(columns=[key_column], inplace=True)
-
     column_order = ["Place", "Name", "Matches", "Exact scores", "Total points", "Avg points per round"]
     if use_user_id:
         column_order.insert(1, "User ID")
@@ -303,30 +409,60 @@ def _build_standings(scored: pd.DataFrame) -> pd.DataFrame:
     ]
     ordered = standings[column_order + round_columns].copy()
     ordered.rename(columns=COLUMN_TRANSLATIONS, inplace=True)
-
-    def _translate_round_column(name: str) -> str:
-        match = ROUND_COLUMN_PATTERN.match(name)
-        if not match:
-            return name
-        round_num, metric = match.groups()
-        metric_label = ROUND_METRIC_TRANSLATIONS.get(metric, metric)
-        return f"Тур {round_num} {metric_label}"
-
-    ordered.columns = [_translate_round_column(col) for col in ordered.columns]
     return ordered
 
 
-def _write_excel(df: pd.DataFrame, output: Path, sheet_name: str) -> None:
+def _write_excel(
+    df: pd.DataFrame, output: Path, sheet_name: str, xlsx_fast: bool = False
+) -> None:
+    # Write to a sibling temp file and rename into place: readers never see
+    # a half-written workbook and a failed save leaves the old file intact.
+    tmp = output.with_suffix(output.suffix + ".tmp")
+    if xlsx_fast:
+        # Direct XML generation: fastest for big standings, but always
+        # rewrites the whole file, so other sheets are not preserved.
+        rows = itertools.chain(
+            [list(df.columns)], df.itertuples(index=False, name=None)
+        )
+        try:
+            fast_xlsx.write_sheet(rows, tmp, sheet_name)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, output)
+        return
     output.parent.mkdir(parents=True, exist_ok=True)
-    mode = "a" if output.exists() else "w"
-    writer_kwargs = {"engine": "openpyxl", "mode": mode}
-    if mode == "a":
-        writer_kwargs["if_sheet_exists"] = "replace"
-    with pd.ExcelWriter(output, **writer_kwargs) as writer:
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
+    workbook = None
+    if output.exists():
+        # Peek at the sheet list cheaply first: when the target sheet is the
+        # only one, the file gets fully rewritten anyway, so the old cell
+        # tree never needs to be loaded.
+        peek = openpyxl.load_workbook(output, read_only=True)
+        sheetnames = peek.sheetnames
+        peek.close()
+        if sheetnames != [sheet_name]:
+            workbook = openpyxl.load_workbook(output)
+            if sheet_name in workbook.sheetnames:
+                del workbook[sheet_name]
+            sheet = workbook.create_sheet(sheet_name)
+    if workbook is None:
+        # Write-only mode streams rows to the XML serializer instead of
+        # keeping the whole cell tree in memory.
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        sheet.append(row)
+    try:
+        workbook.save(tmp)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, output)
 
 
-def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description=(
             "Compare predictions with real results and produce an Excel standings table."
@@ -358,29 +494,60 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         default=DEFAULT_SHEET_NAME,
         help="Name of the sheet to create/replace in the output workbook",
     )
-    return parser.parse_args(list(argv) if argv is not None else None)
-
+    parser.add_argument(
+        "--xlsx-fast",
+        action="store_true",
+        help=(
+            "Write the workbook via direct XML generation (fastest for large "
+            "standings; replaces the whole file instead of a single sheet)"
+        ),
+    )
+    return parser
 
-def main(argv: Iterable[str] | None = None) -> int:
-    args = parse_args(argv or sys.argv[1:])
-    pred_path = args.predictions if isinstance(args.predictions, Path) else Path(args.predictions)
-    result_path = args.results if isinstance(args.results, Path) else Path(args.results)
-    output_path = args.output if isinstance(args.output, Path) else Path(args.output)
 
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+    # Built lazily so importing the module as a library stays cheap, and
+    # cached so looped main(argv) calls reuse one parser.
+    return _build_parser().parse_args(list(argv) if argv is not None else None)
+
+
+def run(
+    predictions: pd.DataFrame,
+    results: pd.DataFrame,
+    output: Path,
+    sheet: str = DEFAULT_SHEET_NAME,
+    xlsx_fast: bool = False,
+) -> int:
+    """Score already-loaded tables and write the standings workbook."""
     try:
-        predictions, results = _load_inputs(pred_path, result_path)
+        predictions, results = _prepare_inputs(predictions, results)
         scored = _score_predictions(predictions, results)
         standings = _build_standings(scored)
-        _write_excel(standings, output_path, args.sheet)
+        _write_excel(standings, output, sheet, xlsx_fast=xlsx_fast)
     except ScoreComputationError as exc:
         print(f"[ERROR] {exc}", file=sys.stderr)
         return 1
 
     print(
-        f"Wrote standings for {len(standings)} participants to {output_path} (sheet '{args.sheet}')."
+        f"Wrote standings for {len(standings)} participants to {output} (sheet '{sheet}')."
     )
     return 0
 
 
+def main(argv: Iterable[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    pred_path = args.predictions if isinstance(args.predictions, Path) else Path(args.predictions)
+    result_path = args.results if isinstance(args.results, Path) else Path(args.results)
+    output_path = args.output if isinstance(args.output, Path) else Path(args.output)
+
+    try:
+        predictions = load_predictions(pred_path)
+        results = load_results(result_path)
+    except ScoreComputationError as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        return 1
+    return run(predictions, results, output_path, args.sheet, xlsx_fast=args.xlsx_fast)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
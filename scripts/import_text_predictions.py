@@ -4,12 +4,13 @@ from __future__ import annotations
 
 import argparse
 import csv
+import functools
 import re
 import sys
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
 
-from text_match_parser import parse_match_line
+from text_match_parser import INVISIBLE_CHARACTERS, parse_match_line
 from team_aliases import normalize_team_name
 
 PREDICTION_COLUMNS: Sequence[str] = (
@@ -23,13 +24,72 @@ PREDICTION_COLUMNS: Sequence[str] = (
     "predicted_away_goals",
 )
 
+class PredictionRow(NamedTuple):
+    """One predictions CSV row; field order matches PREDICTION_COLUMNS."""
+
+    match_id: str
+    round: str
+    user_id: str
+    user: str
+    home_team: str
+    away_team: str
+    predicted_home_goals: str
+    predicted_away_goals: str
+
+
+class ResultRow(NamedTuple):
+    """One results CSV row as read by this importer."""
+
+    match_id: str
+    round: str
+    home_team: str
+    away_team: str
+    home_goals: str
+    away_goals: str
+
+
+RESULT_COLUMNS: Sequence[str] = ResultRow._fields
+
+
+class ResultsIndex(NamedTuple):
+    """Result rows indexed by fixture and by (round, fixture).
+
+    The round-qualified index turns the common --round lookup into a single
+    dict probe; the plain fixture index serves the no-override path.
+    """
+
+    by_fixture: Dict[Tuple[str, str], List[ResultRow]]
+    by_fixture_round: Dict[Tuple[str, str, str], List[ResultRow]]
+
 USER_ID_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_-]*\d+[A-Za-z0-9_-]*$")
 GENERATED_ID_PATTERN = re.compile(r"^U(\d+)$")
-CHAT_HEADER_PATTERN = re.compile(r"^(?P<name>.+?),\s*\[[^\]]+\](?:\s*-.*)?$")
+# re.ASCII narrows \s to the ASCII table (the dot still matches any script);
+# NBSP is listed explicitly since chat exports use it around timestamps.
+CHAT_HEADER_PATTERN = re.compile(
+    r"^(?P<name>.+?),[\s\xa0]*\[[^\]]+\](?:[\s\xa0]*-.*)?$", re.ASCII
+)
 
+# Bound method aliases: the patterns are anchored, so match == fullmatch here,
+# and the alias skips one attribute lookup per candidate string.
+_IS_USER_ID = USER_ID_PATTERN.match
+_CHAT_HEADER_MATCH = CHAT_HEADER_PATTERN.match
 
+# Any letter in any script: word character that is neither digit nor underscore.
+_ALPHA_RE = re.compile(r"[^\W\d_]")
+
+# Cheap pre-filter: every match line must contain digit-separator-digit
+# somewhere, so metadata lines skip the full pattern set. The class also
+# admits the invisible characters parse_match_line strips before matching.
+_LOOKS_LIKE_SCORE = re.compile(
+    rf"\d[\s{INVISIBLE_CHARACTERS}]*[:\-–][\s{INVISIBLE_CHARACTERS}]*\d"
+)
+
+
+@functools.lru_cache(maxsize=None)
 def _normalize_team(name: str) -> str:
-    return normalize_team_name(name)
+    # Interned names make the fixture-key tuples hash and compare by
+    # identity on the hot dict lookups.
+    return sys.intern(normalize_team_name(name))
 
 
 def _normalize_name(name: str) -> str:
@@ -54,13 +114,13 @@ def _fixture_label(home_team: str, away_team: str, round_override: int | None) -
 
 
 def _contains_letters(text: str) -> bool:
-    return any(ch.isalpha() for ch in text)
+    return _ALPHA_RE.search(text) is not None
 
 
 def _strip_chat_header(text: str) -> str:
     """Remove messenger export headers like 'Name, [1/14/26 - PM] - ...'."""
     stripped = text.strip()
-    match = CHAT_HEADER_PATTERN.match(stripped)
+    match = _CHAT_HEADER_MATCH(stripped)
     if match:
         return match.group("name").strip()
     return stripped
@@ -68,51 +128,46 @@ def _strip_chat_header(text: str) -> str:
 
 def _resolve_result_row(
     parsed: Dict[str, str],
-    results_index: Dict[Tuple[str, str], List[Dict[str, str]]],
+    results_index: ResultsIndex,
     round_override: int | None,
-    ambiguous_fixtures: set[str],
-) -> Dict[str, str] | None:
+    ambiguous_fixtures: dict[str, None],
+) -> ResultRow | None:
     key = _fixture_key(parsed["home_team"], parsed["away_team"])
-    rows = results_index.get(key, [])
-    if not rows:
-        return None
     if round_override is not None:
-        round_key = _normalize_round(round_override)
-        round_rows = [
-            row
-            for row in rows
-            if _normalize_round(row.get("round", "")) == round_key
-        ]
+        round_key = (_normalize_round(round_override),) + key
+        round_rows = results_index.by_fixture_round.get(round_key, [])
         if len(round_rows) == 1:
             return round_rows[0]
         if len(round_rows) > 1:
-            ambiguous_fixtures.add(
+            ambiguous_fixtures[
                 _fixture_label(parsed["home_team"], parsed["away_team"], round_override)
-            )
+            ] = None
+        return None
+    rows = results_index.by_fixture.get(key, [])
+    if not rows:
         return None
     if len(rows) == 1:
         return rows[0]
-    ambiguous_fixtures.add(
+    ambiguous_fixtures[
         _fixture_label(parsed["home_team"], parsed["away_team"], round_override)
-    )
+    ] = None
     return None
 
 
 def _parse_prediction_match(
     line: str,
-    results_index: Dict[Tuple[str, str], List[Dict[str, str]]],
+    parsed: Dict[str, str],
+    results_index: ResultsIndex,
     round_override: int | None,
-    ambiguous_fixtures: set[str],
-) -> Tuple[Dict[str, str], Dict[str, str]] | None:
-    parsed = parse_match_line(line)
-    if parsed:
-        result_row = _resolve_result_row(
-            parsed, results_index, round_override, ambiguous_fixtures
-        )
-        if result_row:
-            return parsed, result_row
+    ambiguous_fixtures: dict[str, None],
+) -> Tuple[Dict[str, str], ResultRow] | None:
+    result_row = _resolve_result_row(
+        parsed, results_index, round_override, ambiguous_fixtures
+    )
+    if result_row:
+        return parsed, result_row
     tokens = line.split()
-    if tokens and USER_ID_PATTERN.match(tokens[0]):
+    if tokens and _IS_USER_ID(tokens[0]):
         for idx in range(1, len(tokens)):
             candidate = " ".join(tokens[idx:])
             parsed_candidate = parse_match_line(candidate)
@@ -126,25 +181,60 @@ def _parse_prediction_match(
     return None
 
 
-def _load_results(path: Path) -> Dict[Tuple[str, str], List[Dict[str, str]]]:
+def _column_positions(header: List[str], columns: Sequence[str]) -> List[int | None]:
+    return [header.index(col) if col in header else None for col in columns]
+
+
+def _row_values(raw: List[str], positions: List[int | None]) -> List[str]:
+    return [
+        raw[pos] if pos is not None and pos < len(raw) else "" for pos in positions
+    ]
+
+
+def _index_results(rows: Iterable[ResultRow]) -> ResultsIndex:
+    """Index result rows by fixture; rows may come from CSV or a prior stage."""
+    by_fixture: Dict[Tuple[str, str], List[ResultRow]] = {}
+    by_fixture_round: Dict[Tuple[str, str, str], List[ResultRow]] = {}
+    for row in rows:
+        key = _fixture_key(row.home_team, row.away_team)
+        by_fixture.setdefault(key, []).append(row)
+        by_fixture_round.setdefault(
+            (_normalize_round(row.round),) + key, []
+        ).append(row)
+    return ResultsIndex(by_fixture, by_fixture_round)
+
+
+def _load_results(path: Path) -> ResultsIndex:
     if not path.exists():
         raise SystemExit(f"Results file {path} was not found.")
+    # Index rows straight off the reader; no intermediate row list.
     with path.open("r", encoding="utf-8", newline="") as fp:
-        reader = csv.DictReader(fp)
-        data = list(reader)
-    if not data:
+        reader = csv.reader(fp)
+        header = next(reader, None)
+        if header is None:
+            rows: Iterable[ResultRow] = ()
+        else:
+            positions = _column_positions(header, RESULT_COLUMNS)
+            rows = (
+                ResultRow(*_row_values(raw, positions)) for raw in reader if raw
+            )
+        index = _index_results(rows)
+    if not index.by_fixture:
         raise SystemExit(f"Results file {path} is empty.")
-    mapping: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
-    for row in data:
-        key = _fixture_key(row["home_team"], row["away_team"])
-        mapping.setdefault(key, []).append(row)
-    return mapping
+    return index
+
 
+def _split_blocks(
+    lines: Iterable[str],
+) -> List[Tuple[List[str], List[Tuple[str, Dict[str, str]]]]]:
+    """Split lines into (metadata, matches) blocks, keeping each parsed match.
 
-def _split_blocks(lines: Iterable[str]) -> List[Tuple[List[str], List[str]]]:
-    blocks: List[Tuple[List[str], List[str]]] = []
+    The parse result is kept next to the raw line so the caller does not run
+    parse_match_line a second time over every match.
+    """
+    blocks: List[Tuple[List[str], List[Tuple[str, Dict[str, str]]]]] = []
     metadata: List[str] = []
-    matches: List[str] = []
+    matches: List[Tuple[str, Dict[str, str]]] = []
 
     def _flush() -> None:
         nonlocal metadata, matches
@@ -159,14 +249,16 @@ def _split_blocks(lines: Iterable[str]) -> List[Tuple[List[str], List[str]]]:
             if not stripped:
                 _flush()
             continue
-        if CHAT_HEADER_PATTERN.match(stripped):
+        if _CHAT_HEADER_MATCH(stripped):
             if matches:
                 _flush()
             metadata.append(stripped)
             continue
-        parsed = parse_match_line(stripped)
+        parsed = (
+            parse_match_line(stripped) if _LOOKS_LIKE_SCORE.search(stripped) else None
+        )
         if parsed:
-            matches.append(stripped)
+            matches.append((stripped, parsed))
             continue
         if matches:
             _flush()
@@ -176,7 +268,7 @@ def _split_blocks(lines: Iterable[str]) -> List[Tuple[List[str], List[str]]]:
 
 
 def _extract_user_info(meta: List[str], idx: int) -> Tuple[str | None, str]:
-    user_id = next((item for item in meta if USER_ID_PATTERN.match(item)), None)
+    user_id = next((item for item in meta if _IS_USER_ID(item)), None)
     name_candidate = next(
         (item for item in reversed(meta) if _contains_letters(item) and item != user_id),
         None,
@@ -195,32 +287,49 @@ def _extract_user_info(meta: List[str], idx: int) -> Tuple[str | None, str]:
     return user_id, user_name
 
 
-def _load_existing_predictions(path: Path) -> List[dict]:
-    if not path.exists():
-        return []
-    with path.open("r", encoding="utf-8", newline="") as fp:
-        reader = csv.DictReader(fp)
-        rows = list(reader)
-    for row in rows:
-        row.setdefault("user_id", "")
-    return rows
-
+class ExistingPredictions(NamedTuple):
+    """Rows plus the lookups derived from them in the same loader pass."""
 
-def _next_generated_user_id(existing_rows: List[dict]) -> int:
-    max_id = 0
-    for row in existing_rows:
-        uid = (row.get("user_id") or "").strip()
-        match = GENERATED_ID_PATTERN.match(uid)
-        if match:
-            max_id = max(max_id, int(match.group(1)))
-    return max_id + 1
+    rows: List[PredictionRow]
+    name_to_id: Dict[str, str]
+    next_user_id: int
 
 
-def _write_predictions(path: Path, rows: List[dict]) -> None:
+def _load_existing_predictions(path: Path) -> ExistingPredictions:
+    rows: List[PredictionRow] = []
+    name_to_id: Dict[str, str] = {}
+    max_generated_id = 0
+    if path.exists():
+        with path.open("r", encoding="utf-8", newline="") as fp:
+            reader = csv.reader(fp)
+            header = next(reader, None)
+            if header is not None:
+                positions = _column_positions(header, PREDICTION_COLUMNS)
+                for raw in reader:
+                    if not raw:
+                        continue
+                    row = PredictionRow(*_row_values(raw, positions))
+                    rows.append(row)
+                    uid = row.user_id.strip()
+                    if not uid:
+                        continue
+                    normalized_name = _normalize_name(row.user)
+                    if normalized_name:
+                        name_to_id[normalized_name] = uid
+                    # Most IDs are hand-assigned; the prefix check skips the
+                    # regex dispatch for them.
+                    if uid.startswith("U"):
+                        match = GENERATED_ID_PATTERN.match(uid)
+                        if match:
+                            max_generated_id = max(max_generated_id, int(match.group(1)))
+    return ExistingPredictions(rows, name_to_id, max_generated_id + 1)
+
+
+def _write_predictions(path: Path, rows: List[PredictionRow]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8", newline="") as fp:
-        writer = csv.DictWriter(fp, fieldnames=PREDICTION_COLUMNS)
-        writer.writeheader()
+        writer = csv.writer(fp)
+        writer.writerow(PREDICTION_COLUMNS)
         writer.writerows(rows)
 
 
@@ -233,31 +342,32 @@ def _row_key_from_values(user_id: str, user: str, match_id: str) -> Tuple[str, s
     return ("name", user_norm, match_norm)
 
 
-def _merge_prediction_rows(
-    existing_rows: List[dict],
-    new_rows: List[dict],
-    clear_matches: bool,
-) -> List[dict]:
-    from collections import OrderedDict
-
-    def _row_key(row: dict) -> Tuple[str, str, str]:
-        return _row_key_from_values(row.get("user_id", ""), row.get("user", ""), row.get("match_id", ""))
+def _key_rows(
+    rows: List[PredictionRow],
+) -> List[Tuple[Tuple[str, str, str], PredictionRow]]:
+    """Pair every row with its merge key so the key is built exactly once."""
+    return [
+        (_row_key_from_values(row.user_id, row.user, row.match_id), row)
+        for row in rows
+    ]
 
-    merged = OrderedDict()
-    for row in existing_rows:
-        merged[_row_key(row)] = row
 
-    if clear_matches:
-        keys_to_remove = {_row_key(row) for row in new_rows}
-        for key in keys_to_remove:
+def _merge_prediction_rows(
+    existing_pairs: List[Tuple[Tuple[str, str, str], PredictionRow]],
+    new_pairs: List[Tuple[Tuple[str, str, str], PredictionRow]],
+    clear_matches: bool,
+) -> List[PredictionRow]:
+    # Plain dicts preserve insertion order, so one pass over each list is enough.
+    merged = dict(existing_pairs)
+    for key, row in new_pairs:
+        if clear_matches:
             merged.pop(key, None)
-
-    for row in new_rows:
-        merged[_row_key(row)] = row
+        merged[key] = row
     return list(merged.values())
 
 
-def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Append user predictions from a text file to the predictions CSV."
     )
@@ -286,42 +396,85 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Replace previous predictions for the same users and fixtures (other rounds stay intact).",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--sort-output",
+        action="store_true",
+        help="Sort the written CSV by (match_id, user) instead of keeping import order.",
+    )
+    return parser
 
 
-def main(argv: Sequence[str] | None = None) -> int:
-    args = parse_args(argv)
-    text_lines = args.text_file.read_text(encoding="utf-8").splitlines()
-    blocks = _split_blocks(text_lines)
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    # Built lazily so importing the module as a library stays cheap, and
+    # cached so looped main(argv) calls reuse one parser.
+    return _build_parser().parse_args(argv)
+
+
+def parse_text(
+    text_file: Path,
+) -> List[Tuple[List[str], List[Tuple[str, Dict[str, str]]]]]:
+    """Split text_file into user blocks (the read phase of run_import)."""
+    # Iterate the file lazily instead of materializing the whole text twice.
+    with text_file.open("r", encoding="utf-8") as fp:
+        return _split_blocks(fp)
+
+
+def run_import(
+    text_file: Path,
+    results_csv: Path,
+    predictions_csv: Path,
+    round_number: int | None = None,
+    clear_users: bool = False,
+    result_rows: Iterable[ResultRow] | None = None,
+    blocks: List[Tuple[List[str], List[Tuple[str, Dict[str, str]]]]] | None = None,
+    sort_output: bool = False,
+) -> List[PredictionRow] | None:
+    """Import predictions from text_file and rewrite predictions_csv.
+
+    Returns the full written row list, or None when nothing could be
+    imported. Pass result_rows when the results are already in memory (e.g.
+    fresh from import_text_results) to skip re-reading results_csv, and
+    blocks to reuse an earlier parse_text call. sort_output orders the CSV
+    by (match_id, user) so downstream joins see a deterministic layout.
+    """
+    if blocks is None:
+        blocks = parse_text(text_file)
     if not blocks:
         print("No predictions found in the provided text file.", file=sys.stderr)
-        return 1
-
-    results_index = _load_results(args.results_csv)
-    existing_rows = _load_existing_predictions(args.predictions_csv)
-
-    next_user_id = _next_generated_user_id(existing_rows)
-    name_to_id: Dict[str, str] = {}
-    for row in existing_rows:
-        normalized_name = _normalize_name(row.get("user", ""))
-        uid = (row.get("user_id") or "").strip()
-        if normalized_name and uid:
-            name_to_id[normalized_name] = uid
-
-    new_rows: List[dict] = []
+        return None
 
+    if result_rows is not None:
+        results_index = _index_results(result_rows)
+        if not results_index.by_fixture:
+            raise SystemExit(f"Results file {results_csv} is empty.")
+    else:
+        results_index = _load_results(results_csv)
+    existing = _load_existing_predictions(predictions_csv)
+    existing_rows = existing.rows
+    name_to_id = existing.name_to_id
+    next_user_id = existing.next_user_id
+
+    # Collect the new rows as one list per column and build the row tuples
+    # once at the end, instead of allocating a row object per parsed match.
+    columns: Tuple[List[str], ...] = tuple([] for _ in PREDICTION_COLUMNS)
+    match_ids, round_values, user_ids, user_names = columns[:4]
+    home_teams, away_teams, predicted_home, predicted_away = columns[4:]
+
+    # Merge keys for the new rows, built alongside the columns so the user
+    # part is normalized once per block instead of once per row later.
+    new_keys: List[Tuple[str, str, str]] = []
     skipped_matches: List[str] = []
-    ambiguous_fixtures: set[str] = set()
+    # Insertion-ordered dict doubles as an ordered set for the warning below.
+    ambiguous_fixtures: dict[str, None] = {}
     for idx, (meta, match_lines) in enumerate(blocks, start=1):
         parsed_matches: List[Tuple[Dict[str, str], Dict[str, str]]] = []
-        for line in match_lines:
+        for line, parsed in match_lines:
             result = _parse_prediction_match(
-                line, results_index, args.round, ambiguous_fixtures
+                line, parsed, results_index, round_number, ambiguous_fixtures
             )
             if result:
                 parsed_matches.append(result)
-                continue
-            if parse_match_line(line):
+            else:
                 skipped_matches.append(line)
         if not parsed_matches:
             continue
@@ -337,44 +490,63 @@ def main(argv: Sequence[str] | None = None) -> int:
                     name_to_id[normalized_name] = user_id
         elif normalized_name and normalized_name not in name_to_id:
             name_to_id[normalized_name] = user_id
+        uid_norm = (user_id or "").strip().lower()
+        key_prefix = (
+            ("id", uid_norm) if uid_norm else ("name", (user_name or "").strip().lower())
+        )
         for match, result_row in parsed_matches:
-            round_value = args.round if args.round is not None else result_row["round"]
-            new_rows.append(
-                {
-                    "match_id": result_row["match_id"],
-                    "round": str(round_value),
-                    "user_id": user_id or "",
-                    "user": user_name,
-                    "home_team": result_row["home_team"],
-                    "away_team": result_row["away_team"],
-                    "predicted_home_goals": match["home_goals"],
-                    "predicted_away_goals": match["away_goals"],
-                }
-            )
-
-    if not new_rows:
+            round_value = round_number if round_number is not None else result_row.round
+            match_ids.append(result_row.match_id)
+            round_values.append(str(round_value))
+            user_ids.append(user_id or "")
+            user_names.append(user_name)
+            home_teams.append(result_row.home_team)
+            away_teams.append(result_row.away_team)
+            predicted_home.append(match["home_goals"])
+            predicted_away.append(match["away_goals"])
+            new_keys.append(key_prefix + (result_row.match_id.strip().lower(),))
+
+    if not match_ids:
         print("Could not match any lines with the known fixtures.", file=sys.stderr)
-        return 1
+        return None
+    new_rows = [PredictionRow(*values) for values in zip(*columns)]
 
-    combined = _merge_prediction_rows(existing_rows, new_rows, args.clear_users)
-    _write_predictions(args.predictions_csv, combined)
+    combined = _merge_prediction_rows(
+        _key_rows(existing_rows), list(zip(new_keys, new_rows)), clear_users
+    )
+    if sort_output:
+        combined.sort(key=lambda row: (row.match_id, row.user))
+    _write_predictions(predictions_csv, combined)
 
-    print(f"Imported {len(new_rows)} predictions into {args.predictions_csv}")
+    print(f"Imported {len(new_rows)} predictions into {predictions_csv}")
     if skipped_matches:
         print(
             "[WARNING] Skipped matches without a matching fixture: "
-            + ", ".join(sorted(set(skipped_matches))),
+            + ", ".join(dict.fromkeys(skipped_matches)),
             file=sys.stderr,
         )
     if ambiguous_fixtures:
         hint = "Use --round or remove old seasons from the results file to disambiguate."
         print(
             "[WARNING] Ambiguous fixtures (multiple matches found): "
-            + ", ".join(sorted(ambiguous_fixtures))
+            + ", ".join(ambiguous_fixtures)
             + f". {hint}",
             file=sys.stderr,
         )
-    return 0
+    return combined
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    rows = run_import(
+        args.text_file,
+        args.results_csv,
+        args.predictions_csv,
+        round_number=args.round,
+        clear_users=args.clear_users,
+        sort_output=args.sort_output,
+    )
+    return 0 if rows is not None else 1
 
 
 if __name__ == "__main__":
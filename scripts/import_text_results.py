@@ -4,22 +4,28 @@ from __future__ import annotations
 
 import argparse
 import csv
+import functools
 import re
 import sys
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
 
 from text_match_parser import parse_match_line
 from team_aliases import normalize_team_name
 
-RESULT_COLUMNS: Sequence[str] = (
-    "match_id",
-    "round",
-    "home_team",
-    "away_team",
-    "home_goals",
-    "away_goals",
-)
+
+class ResultRow(NamedTuple):
+    """One results CSV row; field order matches RESULT_COLUMNS."""
+
+    match_id: str
+    round: str
+    home_team: str
+    away_team: str
+    home_goals: str
+    away_goals: str
+
+
+RESULT_COLUMNS: Sequence[str] = ResultRow._fields
 
 
 def _parse_matches(lines: Iterable[str]) -> List[dict]:
@@ -55,48 +61,75 @@ def _match_key(round_value: str | int, home_team: str, away_team: str) -> Tuple[
     return (round_key, _normalize_team(home_team), _normalize_team(away_team))
 
 
-def _load_existing(path: Path) -> List[dict]:
-    """Return existing result rows (or an empty list when the file is missing)."""
+def _load_existing(
+    path: Path,
+) -> Tuple[List[str] | None, List[Tuple[Tuple[str, str, str], ResultRow]]]:
+    """Return the CSV header and existing (match key, row) pairs.
+
+    The key is computed once here so the dedup index and the final filter in
+    main reuse it instead of re-normalizing every row. The header lets the
+    caller decide whether an in-place append is layout-safe.
+    """
     if not path.exists():
-        return []
+        return None, []
+    pairs: List[Tuple[Tuple[str, str, str], ResultRow]] = []
     with path.open("r", encoding="utf-8", newline="") as fp:
-        reader = csv.DictReader(fp)
-        rows = list(reader)
-    return rows
-
-
-def _index_existing(rows: List[dict]) -> dict[Tuple[str, str, str], dict]:
-    index: dict[Tuple[str, str, str], dict] = {}
-    for row in rows:
-        key = _match_key(
-            row.get("round", ""),
-            row.get("home_team", ""),
-            row.get("away_team", ""),
-        )
+        reader = csv.reader(fp)
+        header = next(reader, None)
+        if header is None:
+            return None, []
+        positions = [
+            header.index(col) if col in header else None for col in RESULT_COLUMNS
+        ]
+        for raw in reader:
+            if not raw:
+                continue
+            row = ResultRow(
+                *[
+                    raw[pos] if pos is not None and pos < len(raw) else ""
+                    for pos in positions
+                ]
+            )
+            pairs.append((_match_key(row.round, row.home_team, row.away_team), row))
+    return header, pairs
+
+
+def _index_existing(
+    pairs: List[Tuple[Tuple[str, str, str], ResultRow]],
+) -> dict[Tuple[str, str, str], ResultRow]:
+    index: dict[Tuple[str, str, str], ResultRow] = {}
+    for key, row in pairs:
         if key not in index:
             index[key] = row
     return index
 
 
-def _next_match_number(existing_rows: List[dict], prefix: str) -> int:
+def _next_match_number(
+    pairs: List[Tuple[Tuple[str, str, str], ResultRow]], prefix: str
+) -> int:
     pattern = re.compile(rf"^{re.escape(prefix)}(\d+)$")
     max_number = 0
-    for row in existing_rows:
-        match_id = row.get("match_id", "")
-        match = pattern.match(match_id)
+    for _key, row in pairs:
+        match = pattern.match(row.match_id)
         if match:
             max_number = max(max_number, int(match.group(1)))
     return max_number
 
 
-def _write_results(path: Path, rows: List[dict]) -> None:
+def _write_results(path: Path, rows: List[ResultRow]) -> None:
     with path.open("w", encoding="utf-8", newline="") as fp:
-        writer = csv.DictWriter(fp, fieldnames=RESULT_COLUMNS)
-        writer.writeheader()
+        writer = csv.writer(fp)
+        writer.writerow(RESULT_COLUMNS)
         writer.writerows(rows)
 
 
-def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+def _append_results(path: Path, rows: List[ResultRow]) -> None:
+    with path.open("a", encoding="utf-8", newline="") as fp:
+        csv.writer(fp).writerows(rows)
+
+
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Append matches described in a text file to a results CSV."
     )
@@ -117,59 +150,88 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         default="M",
         help="Prefix to use for generated match_id values (default: M).",
     )
-    return parser.parse_args(argv)
+    return parser
 
 
-def main(argv: Iterable[str] | None = None) -> int:
-    args = parse_args(argv)
-
-    text_lines = args.text_file.read_text(encoding="utf-8").splitlines()
-    parsed_matches = _parse_matches(text_lines)
-
-    existing_rows = _load_existing(args.results_csv)
-    existing_index = _index_existing(existing_rows)
-    next_match_number = _next_match_number(existing_rows, args.match_prefix)
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+    # Built lazily so importing the module as a library stays cheap, and
+    # cached so looped main(argv) calls reuse one parser.
+    return _build_parser().parse_args(argv)
+
+
+def parse_text(text_file: Path) -> List[dict]:
+    """Parse the match lines of text_file (the read phase of run_import)."""
+    # Iterate the file lazily instead of materializing the whole text twice.
+    with text_file.open("r", encoding="utf-8") as fp:
+        return _parse_matches(fp)
+
+
+def run_import(
+    text_file: Path,
+    results_csv: Path,
+    round_number: int,
+    match_prefix: str = "M",
+    parsed_matches: List[dict] | None = None,
+) -> List[ResultRow]:
+    """Import matches from text_file into results_csv and return every row.
+
+    The returned list is exactly what was written, so callers chaining
+    further stages can reuse it instead of re-reading the CSV. Pass
+    parsed_matches to reuse an earlier parse_text call.
+    """
+    if parsed_matches is None:
+        parsed_matches = parse_text(text_file)
+
+    header, existing_pairs = _load_existing(results_csv)
+    existing_index = _index_existing(existing_pairs)
+    next_match_number = _next_match_number(existing_pairs, match_prefix)
 
     new_rows = []
     new_keys = set()
     for match in parsed_matches:
-        key = _match_key(args.round, match["home_team"], match["away_team"])
+        key = _match_key(round_number, match["home_team"], match["away_team"])
         if key in new_keys:
             continue
         new_keys.add(key)
         existing_row = existing_index.get(key)
-        match_id = (existing_row or {}).get("match_id", "")
+        match_id = existing_row.match_id if existing_row else ""
         if not match_id:
             next_match_number += 1
-            match_id = f"{args.match_prefix}{next_match_number}"
+            match_id = f"{match_prefix}{next_match_number}"
         new_rows.append(
-            {
-                "match_id": match_id,
-                "round": str(args.round),
-                "home_team": match["home_team"],
-                "away_team": match["away_team"],
-                "home_goals": match["home_goals"],
-                "away_goals": match["away_goals"],
-            }
+            ResultRow(
+                match_id=match_id,
+                round=str(round_number),
+                home_team=match["home_team"],
+                away_team=match["away_team"],
+                home_goals=match["home_goals"],
+                away_goals=match["away_goals"],
+            )
         )
 
-    kept_rows = []
-    if new_keys:
-        for row in existing_rows:
-            key = _match_key(
-                row.get("round", ""),
-                row.get("home_team", ""),
-                row.get("away_team", ""),
-            )
-            if key in new_keys:
-                continue
-            kept_rows.append(row)
+    replaces_existing = bool(new_keys) and any(
+        key in new_keys for key, _row in existing_pairs
+    )
+    if existing_pairs and not replaces_existing and header == list(RESULT_COLUMNS):
+        # Nothing to rewrite and the on-disk layout matches: append only the
+        # new rows, making a round's import O(new rows), not O(all rows).
+        _append_results(results_csv, new_rows)
+        all_rows = [row for _key, row in existing_pairs] + new_rows
     else:
-        kept_rows = existing_rows
-    all_rows = kept_rows + new_rows
-    _write_results(args.results_csv, all_rows)
+        if new_keys:
+            kept_rows = [row for key, row in existing_pairs if key not in new_keys]
+        else:
+            kept_rows = [row for _key, row in existing_pairs]
+        all_rows = kept_rows + new_rows
+        _write_results(results_csv, all_rows)
+
+    print(f"Imported {len(new_rows)} matches into {results_csv}")
+    return all_rows
 
-    print(f"Imported {len(new_rows)} matches into {args.results_csv}")
+
+def main(argv: Iterable[str] | None = None) -> int:
+    args = parse_args(argv)
+    run_import(args.text_file, args.results_csv, args.round, args.match_prefix)
     return 0
 
 
@@ -7,9 +7,7 @@ import unicodedata
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
-from text_match_parser import INVISIBLE_CHARACTERS, format_match_line, parse_match_line
-
-_REMOVE_INVISIBLE = str.maketrans("", "", INVISIBLE_CHARACTERS)
+from text_match_parser import cleanup_line, format_match_line, parse_match_line
 
 
 def _normalize_unicode(text: str) -> str:
@@ -18,20 +16,15 @@ def _normalize_unicode(text: str) -> str:
     return unicodedata.normalize("NFC", text)
 
 
-def _normalize_non_match_line(line: str) -> str:
-    """Trim metadata/comment lines and strip invisible characters."""
-    cleaned = line.replace("\xa0", " ").translate(_REMOVE_INVISIBLE)
-    return cleaned.strip()
-
-
 def _normalize_lines(lines: Iterable[str]) -> Tuple[List[str], int, int]:
     """Return normalized lines, number of changed lines, and match count."""
     normalized: List[str] = []
     changed = 0
     match_lines = 0
     for raw in lines:
-        stripped = _normalize_non_match_line(raw)
-        parsed = parse_match_line(stripped)
+        # Clean once and tell the parser the line is already canonical.
+        stripped = cleanup_line(raw)
+        parsed = parse_match_line(stripped, cleaned=True)
         if parsed:
             match_lines += 1
             normalized_line = format_match_line(parsed)
@@ -1,6 +1,8 @@
 """Utilities for normalizing team names written in multiple languages."""
 from __future__ import annotations
 
+import functools
+import sys
 import unicodedata
 
 from thefuzz import fuzz, process
@@ -155,7 +157,13 @@ TEAM_ALIASES = {
     "brighton hove albion": "brighton",
 }
 
-_ALIAS_KEYS = tuple(TEAM_ALIASES.keys())
+# Interned copies: canonical names returned from here are shared objects, so
+# downstream dict keys built from them hash and compare by identity.
+_TEAM_ALIASES_INTERNED = {
+    sys.intern(key): sys.intern(value) for key, value in TEAM_ALIASES.items()
+}
+
+_ALIAS_KEYS = tuple(_TEAM_ALIASES_INTERNED.keys())
 _FUZZY_MIN_LENGTH = 4
 _FUZZY_MATCH_THRESHOLD = 88
 _FUZZY_MIN_MARGIN = 5
@@ -172,9 +180,10 @@ def _fuzzy_alias_match(base: str) -> str | None:
         return None
     if len(matches) > 1 and (best_score - matches[1][1]) < _FUZZY_MIN_MARGIN:
         return None
-    return TEAM_ALIASES.get(best_key)
+    return _TEAM_ALIASES_INTERNED.get(best_key)
 
 
+@functools.lru_cache(maxsize=1024)
 def normalize_team_name(name: str) -> str:
     """Return a canonical lowercase team name for cross-language matching."""
     if not name:
@@ -183,9 +192,9 @@ def normalize_team_name(name: str) -> str:
     base = base.translate(_REMOVE_INVISIBLE).replace("\xa0", " ")
     base = base.replace("ё", "е")
     base = " ".join(base.lower().replace("-", " ").split())
-    direct = TEAM_ALIASES.get(base)
+    direct = _TEAM_ALIASES_INTERNED.get(base)
     if direct:
         return direct
     # Fuzzy fallback helps with small typos without masking larger mistakes.
     fuzzy = _fuzzy_alias_match(base)
-    return fuzzy or base
+    return fuzzy or sys.intern(base)
@@ -6,7 +6,9 @@ import re
 from typing import Dict, Optional
 
 INVISIBLE_CHARACTERS = "\ufeff\u200b\u200c\u200d\u2060"
-_REMOVE_INVISIBLE = str.maketrans("", "", INVISIBLE_CHARACTERS)
+_INVISIBLE_RE = re.compile(f"[{INVISIBLE_CHARACTERS}]+")
+# \s already covers NBSP (\xa0) in Unicode mode.
+_WS_RE = re.compile(r"\s+")
 
 MATCH_PATTERNS = [
     # Format: Team 1 2 : 1 Team 2 (space before the score is optional)
@@ -27,20 +29,44 @@ MATCH_PATTERNS = [
     ),
 ]
 
-def _cleanup_line(line: str) -> str:
+# Bound match methods, hoisted so the hot loop skips one attribute lookup
+# per pattern per line.
+_MATCHERS = tuple(pattern.match for pattern in MATCH_PATTERNS)
+
+_DIGIT_RE = re.compile(r"\d")
+
+
+def cleanup_line(line: str) -> str:
     """Normalize spacing and drop invisible characters for robust parsing."""
-    normalized = line.replace("\xa0", " ").translate(_REMOVE_INVISIBLE)
-    normalized = " ".join(normalized.strip().split())
-    return normalized
+    return _WS_RE.sub(" ", _INVISIBLE_RE.sub("", line)).strip()
+
 
+def parse_match_line(line: str, cleaned: bool = False) -> Optional[Dict[str, str]]:
+    """Return parsed match components or None if the line is not a match.
 
-def parse_match_line(line: str) -> Optional[Dict[str, str]]:
-    """Return parsed match components or None if the line is not a match."""
-    stripped = _cleanup_line(line)
+    Pass ``cleaned=True`` when the caller already ran ``cleanup_line`` on the
+    input to avoid cleaning the same line twice.
+    """
+    stripped = line if cleaned else cleanup_line(line)
     if not stripped or stripped.startswith("#"):
         return None
-    for pattern in MATCH_PATTERNS:
-        match = pattern.match(stripped)
+    # Fast path for the canonical "Home - Away H:A" form emitted by
+    # format_match_line: a plain split beats the regex dispatch. The no-digit
+    # guard on the team part keeps precedence identical to MATCH_PATTERNS.
+    head, sep, score = stripped.rpartition(" ")
+    if sep and " - " in head and not _DIGIT_RE.search(head):
+        home_goals, colon, away_goals = score.partition(":")
+        if colon and home_goals.isdigit() and away_goals.isdigit():
+            home, _, away = head.partition(" - ")
+            if home and away:
+                return {
+                    "home_team": home.strip(),
+                    "away_team": away.strip(),
+                    "home_goals": home_goals,
+                    "away_goals": away_goals,
+                }
+    for matcher in _MATCHERS:
+        match = matcher(stripped)
         if match:
             return {
                 "home_team": match.group("home").strip(),
@@ -3,16 +3,28 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable
+
+# Opt in to openpyxl's lxml serializer (its streaming fast path) before the
+# sibling imports pull in openpyxl; the flag is read once at import time and
+# must be the literal string "True".
+os.environ.setdefault("OPENPYXL_LXML", "True")
 
 import generate_scoreboard
 import import_text_predictions
 import import_text_results
 
+log = logging.getLogger(__name__)
 
-def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Import text results and refresh the standings workbook."
     )
@@ -70,65 +82,206 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Replace existing predictions for the same users and fixtures (older rounds remain).",
     )
-    return parser.parse_args(list(argv) if argv is not None else None)
+    parser.add_argument(
+        "--xlsx-fast",
+        action="store_true",
+        help=(
+            "Write the standings workbook via direct XML generation "
+            "(fastest for large standings; replaces the whole file)."
+        ),
+    )
+    parser.add_argument(
+        "--sort-predictions",
+        action="store_true",
+        help="Write the predictions CSV sorted by (match_id, user).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the resolved per-stage commands without touching any file.",
+    )
+    return parser
 
 
-def _build_import_args(args: argparse.Namespace) -> List[str]:
-    cmd = [
-        str(args.text_file),
-        str(args.results),
-        "--round",
-        str(args.round),
-    ]
-    if args.match_prefix != "M":
-        cmd.extend(["--match-prefix", args.match_prefix])
-    return cmd
+# Built once at import: callers driving main(argv) in a loop skip the
+# repeated add_argument setup.
+_PARSER = _build_parser()
 
 
-def _build_scoreboard_args(args: argparse.Namespace) -> List[str]:
-    cmd = [
-        str(args.predictions),
-        str(args.results),
-        str(args.output),
-    ]
-    if args.sheet != "Standings":
-        cmd.extend(["--sheet", args.sheet])
-    return cmd
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+    return _PARSER.parse_args(list(argv) if argv is not None else None)
 
 
-def _build_prediction_args(args: argparse.Namespace) -> List[str]:
-    cmd = [
-        str(args.predictions_text),
-        str(args.results),
-        str(args.predictions),
+def _plan_commands(args: argparse.Namespace) -> list[str]:
+    """Equivalent per-stage command lines with fully resolved paths."""
+    results = args.results.resolve()
+    predictions = args.predictions.resolve()
+    commands = [
+        f"import_text_results.py {args.text_file.resolve()} {results} "
+        f"--round {args.round} --match-prefix {args.match_prefix}"
     ]
-    if args.predictions_round is not None:
-        cmd.extend(["--round", str(args.predictions_round)])
-    if args.clear_predictions:
-        cmd.append("--clear-users")
-    return cmd
+    if args.predictions_text:
+        command = (
+            f"import_text_predictions.py {args.predictions_text.resolve()} "
+            f"{results} {predictions}"
+        )
+        if args.predictions_round is not None:
+            command += f" --round {args.predictions_round}"
+        if args.clear_predictions:
+            command += " --clear-users"
+        if args.sort_predictions:
+            command += " --sort-output"
+        commands.append(command)
+    command = (
+        f"generate_scoreboard.py {predictions} {results} {args.output.resolve()} "
+        f"--sheet {args.sheet}"
+    )
+    if args.xlsx_fast:
+        command += " --xlsx-fast"
+    commands.append(command)
+    return commands
+
+
+def _stamp_path(output: Path) -> Path:
+    return output.with_suffix(".stamp.json")
+
+
+def _file_digest(path: Path) -> str:
+    with path.open("rb") as fp:
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+def _input_stamp(args: argparse.Namespace) -> dict | None:
+    """Fingerprint everything the scoreboard stage depends on, or None."""
+    stamp = {
+        "sheet": args.sheet,
+        "output": os.fspath(args.output),
+        "xlsx_fast": args.xlsx_fast,
+    }
+    paths = (args.predictions, args.results)
+    try:
+        # sha256 releases the GIL on large buffers, so hashing the inputs in
+        # parallel overlaps their reads and digest work.
+        with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+            digests = list(pool.map(_file_digest, paths))
+    except OSError:
+        return None
+    stamp["predictions"], stamp["results"] = digests
+    return stamp
 
 
 def main(argv: Iterable[str] | None = None) -> int:
     args = parse_args(argv)
 
-    print(f"[INFO] Importing results from {args.text_file} into {args.results}...")
-    import_rc = import_text_results.main(_build_import_args(args))
-    if import_rc != 0:
-        return import_rc
+    if args.dry_run:
+        # Lets profiling runs measure the orchestration overhead on its own
+        # and shows exactly what a real run would do.
+        for command in _plan_commands(args):
+            print(command)
+        return 0
+
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        log.warning(
+            "lxml is not installed; openpyxl will use the slower "
+            "stdlib XML serializer when writing the workbook."
+        )
+
+    # The two text files are independent, so their parse phases overlap in a
+    # small thread pool; resolution against the results index stays serial
+    # because predictions need the freshly imported rows.
+    blocks = None
+    if args.predictions_text:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            matches_future = pool.submit(import_text_results.parse_text, args.text_file)
+            blocks_future = pool.submit(
+                import_text_predictions.parse_text, args.predictions_text
+            )
+            parsed_matches = matches_future.result()
+            blocks = blocks_future.result()
+    else:
+        parsed_matches = import_text_results.parse_text(args.text_file)
 
+    # Lazy %-formatting: no string is built when the level is filtered out.
+    log.info("Importing results from %s into %s...", args.text_file, args.results)
+    result_rows = import_text_results.run_import(
+        args.text_file,
+        args.results,
+        args.round,
+        args.match_prefix,
+        parsed_matches=parsed_matches,
+    )
+
+    prediction_rows = None
     if args.predictions_text:
-        print(
-            f"[INFO] Importing predictions from {args.predictions_text} into {args.predictions}..."
+        log.info(
+            "Importing predictions from %s into %s...",
+            args.predictions_text,
+            args.predictions,
+        )
+        prediction_rows = import_text_predictions.run_import(
+            args.predictions_text,
+            args.results,
+            args.predictions,
+            round_number=args.predictions_round,
+            clear_users=args.clear_predictions,
+            result_rows=result_rows,
+            blocks=blocks,
+            sort_output=args.sort_predictions,
         )
-        pred_rc = import_text_predictions.main(_build_prediction_args(args))
-        if pred_rc != 0:
-            return pred_rc
+        if prediction_rows is None:
+            return 1
 
-    print(f"[INFO] Rebuilding standings in {args.output}...")
-    score_rc = generate_scoreboard.main(_build_scoreboard_args(args))
+    # A matching stamp means neither input CSV nor the target settings
+    # changed since the last successful rebuild, so the xlsx is current.
+    stamp = _input_stamp(args)
+    stamp_path = _stamp_path(args.output)
+    if stamp is not None and args.output.exists():
+        try:
+            if json.loads(stamp_path.read_text(encoding="utf-8")) == stamp:
+                log.info("Standings in %s are up-to-date; skipping rebuild.", args.output)
+                return 0
+        except (OSError, ValueError):
+            pass
+
+    log.info("Rebuilding standings in %s...", args.output)
+    # Both importers return the rows they just wrote, so the scoreboard stage
+    # works from memory instead of re-reading the CSVs it depends on.
+    try:
+        results_frame = generate_scoreboard.frame_from_rows(
+            result_rows,
+            import_text_results.RESULT_COLUMNS,
+            generate_scoreboard.RESULT_DTYPES,
+        )
+        # Columnar snapshot next to the CSV: standalone scoreboard runs pick
+        # it up and skip the CSV parse while it stays newer than the CSV.
+        generate_scoreboard.write_snapshot(results_frame, args.results)
+        if prediction_rows is not None:
+            predictions_frame = generate_scoreboard.frame_from_rows(
+                prediction_rows,
+                import_text_predictions.PREDICTION_COLUMNS,
+                generate_scoreboard.PREDICTION_DTYPES,
+            )
+        else:
+            predictions_frame = generate_scoreboard.load_predictions(args.predictions)
+    except generate_scoreboard.ScoreComputationError as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        return 1
+    score_rc = generate_scoreboard.run(
+        predictions_frame,
+        results_frame,
+        args.output,
+        args.sheet,
+        xlsx_fast=args.xlsx_fast,
+    )
+    if score_rc == 0 and stamp is not None:
+        stamp_path.write_text(json.dumps(stamp), encoding="utf-8")
     return score_rc
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="[%(levelname)s] %(message)s", stream=sys.stderr
+    )
     raise SystemExit(main())